@@ -0,0 +1,60 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from config.settings import settings
+
+router = APIRouter()
+
+def _require_profile_token(request: Request):
+    """Only callers holding an allow-listed profiling token may read profiles"""
+    token = request.headers.get(settings.PROFILE_HEADER)
+    if not token or token not in settings.PROFILE_TOKENS:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+def _profile_path(profile_id: str, suffix: str) -> Path:
+    """Resolve a stored artifact, refusing anything outside the profile directory"""
+    directory = Path(settings.PROFILE_DIR).resolve()
+    path = (directory / f"{profile_id}.{suffix}").resolve()
+    if path.parent != directory or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return path
+
+@router.get("/profiles")
+async def list_profiles(request: Request):
+    """List stored request profiles, newest first"""
+    _require_profile_token(request)
+    
+    directory = Path(settings.PROFILE_DIR)
+    profiles = []
+    if directory.exists():
+        for meta in sorted(directory.glob("*.json"), key=lambda p: p.name, reverse=True):
+            data = json.loads(meta.read_text())
+            profiles.append({
+                key: data.get(key)
+                for key in ("id", "method", "path", "status", "created_at", "total_ms", "profile_scope")
+            })
+    
+    return {"success": True, "profiles": profiles}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    """Get the timeline and metadata of one profiled request"""
+    _require_profile_token(request)
+    return json.loads(_profile_path(profile_id, "json").read_text())
+
+@router.get("/profiles/{profile_id}/download")
+async def download_profile(profile_id: str, request: Request):
+    """Download the sampling profile (HTML from pyinstrument, text from cProfile)"""
+    _require_profile_token(request)
+    
+    meta = json.loads(_profile_path(profile_id, "json").read_text())
+    if not meta.get("profile_file"):
+        raise HTTPException(status_code=404, detail="No sampling profile for this request")
+    suffix = meta["profile_file"].rsplit(".", 1)[-1]
+    return FileResponse(_profile_path(profile_id, suffix), filename=meta["profile_file"])
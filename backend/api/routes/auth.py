@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
 from typing import Optional
 import sys
 from pathlib import Path
@@ -11,8 +11,10 @@ from models.schemas import (
 )
 from database.db import (
     create_user, verify_user, create_session, verify_session,
-    delete_session, add_favorite, remove_favorite, get_favorites, is_favorite
+    delete_session, add_favorite, remove_favorite, get_favorites, is_favorite,
+    get_favorites_nearby
 )
+from config.settings import settings
 
 router = APIRouter()
 
@@ -147,6 +149,27 @@ async def get_user_favorites(authorization: Optional[str] = Header(None)):
     
     return FavoriteResponse(success=True, favorites=favorites)
 
+@router.get("/favorites/nearby", response_model=FavoriteResponse)
+async def get_nearby_favorites(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(settings.SEARCH_RADIUS, gt=0, le=50000, description="Radius in meters"),
+    authorization: Optional[str] = Header(None)
+):
+    """Get user favorites within a radius of a location, nearest first"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    token = authorization.replace("Bearer ", "")
+    user_id = verify_session(token)
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    favorites = get_favorites_nearby(user_id, lat, lng, radius)
+    
+    return FavoriteResponse(success=True, favorites=favorites)
+
 @router.get("/favorites/check/{place_id}")
 async def check_favorite(
     place_id: str,
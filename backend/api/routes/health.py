@@ -1,12 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from models.schemas import HealthResponse
+from models.schemas import HealthResponse, ReadinessResponse, RateLimitStatsResponse
 from config.settings import settings
+from services.rate_limiter import search_admission
 
 router = APIRouter()
 
@@ -24,3 +26,32 @@ async def health_check():
         google_maps_api_configured=bool(settings.GOOGLE_MAPS_API_KEY),
         gemini_api_configured=bool(settings.GEMINI_API_KEY)
     )
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(request: Request):
+    """
+    Readiness probe: only succeeds once startup warm-up has finished
+    
+    Returns:
+        ReadinessResponse, with status 503 while the app is still starting
+    """
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(
+            status_code=503,
+            content=ReadinessResponse(ready=False).model_dump()
+        )
+    
+    return ReadinessResponse(
+        ready=True,
+        startup_ms=round(request.app.state.startup_seconds * 1000, 1)
+    )
+
+@router.get("/limits", response_model=RateLimitStatsResponse)
+async def rate_limit_stats():
+    """
+    Search rate limiting and load shedding counters for this worker
+    
+    Returns:
+        RateLimitStatsResponse with admitted and rejected request counts
+    """
+    return RateLimitStatsResponse(**search_admission.stats())
@@ -1,45 +1,153 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Header, Depends
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Optional
+import asyncio
+import sqlite3
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from models.schemas import SearchRequest, SearchResponse, ErrorResponse
+from models.schemas import SearchRequest, SearchResponse, SuggestResponse, ErrorResponse
+from config.settings import settings
 from services.google_maps_service import GoogleMapsService
 from services.gemini_service import GeminiService
+from services.suggest_service import suggestion_index, normalize_query
+from services.ranking_service import RankingService
+from services.prefetch_service import PrefetchScheduler
+from services.rate_limiter import search_admission, session_cache, client_key
+from database.db import verify_session, refresh_place
+from services.profiling import span
 
 router = APIRouter()
 
 # Initialize services
 google_maps_service = GoogleMapsService()
 gemini_service = GeminiService()
+ranking_service = RankingService()
+prefetch_scheduler = PrefetchScheduler(google_maps_service, gemini_service)
 
-@router.post("/search", response_model=SearchResponse)
+async def admit_search(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_forwarded_for: Optional[str] = Header(None)
+):
+    """Shed load, then rate limit per client, before any upstream call is made"""
+    # Shed first: a saturated server shouldn't spend a session lookup or the
+    # caller's rate limit budget on a request it will reject anyway
+    rejection = search_admission.enter()
+    if rejection is None:
+        try:
+            user_id = None
+            if authorization and authorization.startswith("Bearer "):
+                user_id = await _session_user(authorization.replace("Bearer ", ""))
+            key = client_key(
+                user_id,
+                request.client.host if request.client else None,
+                x_forwarded_for
+            )
+        except BaseException:
+            search_admission.release()
+            raise
+        rejection = search_admission.charge(key)
+    if rejection:
+        status_code, retry_after = rejection
+        detail = "Too many searches, slow down" if status_code == 429 else "Server busy, try again shortly"
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+    try:
+        yield
+    finally:
+        search_admission.release()
+
+async def _session_user(token: str) -> Optional[int]:
+    """Resolve a session token to its user id, via a short-lived cache"""
+    found, user_id = session_cache.get(token)
+    if not found:
+        try:
+            # verify_session opens SQLite and may wait on locks; keep it off the loop
+            user_id = await run_in_threadpool(verify_session, token)
+        except sqlite3.Error as e:
+            # Fall back to rate limiting by IP rather than failing the search
+            print(f"Session lookup failed during admission: {e}")
+            return None
+        session_cache.put(token, user_id)
+    return user_id
+
+def _request_queries(request: SearchRequest) -> List[str]:
+    """Collect the distinct, non-empty queries from a search request"""
+    queries = []
+    seen = set()
+    for query in [request.query or ""] + (request.queries or []):
+        query = query.strip()
+        if query and normalize_query(query) not in seen:
+            seen.add(normalize_query(query))
+            queries.append(query)
+    return queries
+
+async def _search_all(queries: List[str], lat: float, lng: float) -> List[List[Dict[str, Any]]]:
+    """Run one Google Maps search per query concurrently, capped by settings"""
+    semaphore = asyncio.Semaphore(settings.SEARCH_FANOUT_CONCURRENCY)
+    
+    async def search_one(query: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await google_maps_service.search_places(query=query, lat=lat, lng=lng)
+    
+    results = await asyncio.gather(*(search_one(q) for q in queries), return_exceptions=True)
+    
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            print(f"Search for '{query}' failed: {result}")
+    return [[] if isinstance(r, Exception) else r for r in results]
+
+def _merge_places(queries: List[str], results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Dedupe places by place_id, tagging each with the queries that found it"""
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for query, places in zip(queries, results):
+        for place in places:
+            # Results without an id can't be matched up, so each stays separate
+            place_id = place.get("place_id") or id(place)
+            if place_id in merged:
+                merged[place_id]["matched_queries"].append(query)
+            else:
+                merged[place_id] = {**place, "matched_queries": [query]}
+    return list(merged.values())
+
+@router.post("/search", response_model=SearchResponse, dependencies=[Depends(admit_search)])
 async def search_businesses(request: SearchRequest):
     """
     Search for small businesses near a location
     
     Args:
-        request: SearchRequest containing query and location
+        request: SearchRequest containing one or more queries and a location
         
     Returns:
         SearchResponse with filtered small businesses
     """
     try:
-        print(f"Search request: {request.query} at ({request.location.lat}, {request.location.lng})")
+        queries = _request_queries(request)
+        print(f"Search request: {queries} at ({request.location.lat}, {request.location.lng})")
         
         # Validate input
-        if not request.query or not request.query.strip():
+        if not queries:
             raise HTTPException(status_code=400, detail="Query cannot be empty")
+        if len(queries) > settings.SEARCH_MAX_QUERIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.SEARCH_MAX_QUERIES} queries per search"
+            )
         
-        # Search places using Google Maps
+        # Search places using Google Maps, one concurrent call per query
         print("Calling Google Maps API...")
-        places = await google_maps_service.search_places(
-            query=request.query,
-            lat=request.location.lat,
-            lng=request.location.lng
-        )
+        results = await _search_all(queries, request.location.lat, request.location.lng)
+        places = _merge_places(queries, results)
         print(f"Google Maps returned {len(places)} places")
         
         if not places:
@@ -49,16 +157,31 @@ async def search_businesses(request: SearchRequest):
                 total=0
             )
         
-        # Filter for small businesses using Gemini AI
+        for query, query_places in zip(queries, results):
+            if query_places:
+                suggestion_index.record(query, request.location.lat, request.location.lng)
+                prefetch_scheduler.record(query, request.location.lat, request.location.lng)
+        
+        # Filter for small businesses using Gemini AI, one pass over the merged set
         filtered_places = await gemini_service.filter_small_businesses(
             places=places,
-            search_query=request.query
+            search_query=", ".join(queries)
         )
         
+        # Add distances, apply max_distance and sort
+        with span("rank"):
+            ranked_places = ranking_service.rank(
+                places=filtered_places,
+                lat=request.location.lat,
+                lng=request.location.lng,
+                sort=request.sort,
+                max_distance=request.max_distance
+            )
+        
         return SearchResponse(
             success=True,
-            places=filtered_places,
-            total=len(filtered_places)
+            places=ranked_places,
+            total=len(ranked_places)
         )
         
     except HTTPException:
@@ -72,6 +195,28 @@ async def search_businesses(request: SearchRequest):
             detail=f"Failed to search for places: {str(e)}"
         )
 
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_queries(
+    prefix: str = Query(..., max_length=100),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(5, ge=1, le=20)
+):
+    """
+    Suggest past search queries starting with a prefix
+    
+    Args:
+        prefix: Text typed so far
+        lat: User's latitude, for local suggestions
+        lng: User's longitude, for local suggestions
+        limit: Maximum number of suggestions
+        
+    Returns:
+        SuggestResponse with the most popular matching queries
+    """
+    suggestions = suggestion_index.suggest(prefix, lat, lng, limit)
+    return SuggestResponse(success=True, suggestions=suggestions)
+
 @router.get("/place/{place_id}")
 async def get_place_details(place_id: str):
     """
@@ -85,6 +230,16 @@ async def get_place_details(place_id: str):
     """
     try:
         details = await google_maps_service.get_place_details(place_id)
+        if details.get("status") == "OK" and details.get("result"):
+            # Keep saved favorites current with Google's data, not client copies
+            try:
+                await asyncio.to_thread(
+                    refresh_place,
+                    {"place_id": place_id, **details["result"]},
+                    settings.PLACE_CACHE_DETAILS_TTL
+                )
+            except Exception as e:
+                print(f"Could not refresh saved place {place_id}: {e}")
         return details
         
     except Exception as e:
@@ -0,0 +1,222 @@
+"""
+SQLite contention benchmark for the auth and favorites write path.
+
+Drives a mixed workload of create_session, verify_session, get_favorites,
+add_favorite and remove_favorite through the database/db.py API at rising
+concurrency, against a throwaway database per storage configuration, and
+reports ops/s, p50/p99 latency and the rate of "database is locked" errors.
+
+Workers are separate processes by default, like uvicorn workers sharing one
+app.db; use --mode thread to model a single worker instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.db_contention
+    python -m benchmarks.db_contention --concurrency 1,4,16,64 --duration 10
+    python -m benchmarks.db_contention --configs delete:full,wal:normal --busy-timeout 0.1
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import db
+
+DEFAULT_MIX = "verify_session=50,get_favorites=15,add_favorite=15,remove_favorite=10,create_session=10"
+PLACE_POOL = 500
+
+def _configure(db_path: str, journal_mode: str, synchronous: str, busy_timeout: float):
+    """Point the db module at the benchmark database and storage settings"""
+    db.DB_PATH = Path(db_path)
+    db.JOURNAL_MODE = journal_mode
+    db.SYNCHRONOUS = synchronous
+    db.BUSY_TIMEOUT = busy_timeout
+    # Workers only open connections; the schema is created once in setup
+    db._db_initialized = True
+
+def _place(index: int) -> dict:
+    """A synthetic place shaped like a Google Maps search result"""
+    return {
+        "place_id": f"bench-place-{index}",
+        "name": f"Bench Place {index}",
+        "formatted_address": f"{index} Queen St W, Toronto, ON",
+        "rating": round(3.0 + (index % 20) / 10, 1),
+        "user_ratings_total": index * 7,
+        "types": ["cafe", "food", "point_of_interest", "establishment"],
+        "geometry": {"location": {"lat": 43.65 + (index % 50) * 0.001, "lng": -79.38 - (index // 50) * 0.001}}
+    }
+
+def _setup(db_path: str, users: int) -> List[Tuple[int, str]]:
+    """Create the schema plus users, sessions and some favorites; return (user_id, token) pairs"""
+    db._db_initialized = False
+    db.init_db()
+    accounts = []
+    for i in range(users):
+        user_id = db.create_user(f"bench{i}", f"bench{i}@example.com", "benchmark")
+        accounts.append((user_id, db.create_session(user_id)))
+        for j in range(5):
+            db.add_favorite(user_id, _place((i * 5 + j) % PLACE_POOL))
+    return accounts
+
+def _run_op(op: str, rng: random.Random, accounts: List[Tuple[int, str]]):
+    user_id, token = rng.choice(accounts)
+    if op == "verify_session":
+        db.verify_session(token)
+    elif op == "create_session":
+        db.create_session(user_id)
+    elif op == "get_favorites":
+        db.get_favorites(user_id)
+    elif op == "add_favorite":
+        db.add_favorite(user_id, _place(rng.randrange(PLACE_POOL)))
+    elif op == "remove_favorite":
+        db.remove_favorite(user_id, f"bench-place-{rng.randrange(PLACE_POOL)}")
+    else:
+        raise ValueError(f"Unknown operation: {op}")
+
+def _worker(
+    worker_id: int,
+    storage: Tuple[str, str, str, float],
+    accounts: List[Tuple[int, str]],
+    mix: Dict[str, int],
+    start_at: float,
+    duration: float,
+    seed: int
+) -> List[Tuple[str, float, str]]:
+    """Run operations until the deadline; return (op, latency_seconds, outcome) records"""
+    _configure(*storage)
+    rng = random.Random(seed * 1000 + worker_id)
+    ops, weights = list(mix), list(mix.values())
+    records = []
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + duration
+
+    while time.time() < deadline:
+        op = rng.choices(ops, weights)[0]
+        began = time.perf_counter()
+        try:
+            _run_op(op, rng, accounts)
+            outcome = "ok"
+        except sqlite3.OperationalError as e:
+            outcome = "locked" if "locked" in str(e) else "error"
+        except Exception:
+            outcome = "error"
+        records.append((op, time.perf_counter() - began, outcome))
+    return records
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def _summarize(records: List[Tuple[str, float, str]], duration: float) -> dict:
+    ok = sorted(latency for _, latency, outcome in records if outcome == "ok")
+    locked = sum(1 for *_, outcome in records if outcome == "locked")
+    errors = sum(1 for *_, outcome in records if outcome == "error")
+    total = len(records)
+    return {
+        "ops": total,
+        "ops_per_sec": round(len(ok) / duration, 1),
+        "p50_ms": round(_percentile(ok, 50) * 1000, 2),
+        "p99_ms": round(_percentile(ok, 99) * 1000, 2),
+        "locked_pct": round(100 * locked / total, 2) if total else 0.0,
+        "errors": errors
+    }
+
+def run_level(
+    storage: Tuple[str, str, str, float],
+    accounts: List[Tuple[int, str]],
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    mode: str,
+    seed: int
+) -> dict:
+    """Run one concurrency level and return its summary"""
+    start_at = time.time() + 0.5
+    jobs = [
+        (worker_id, storage, accounts, mix, start_at, duration, seed)
+        for worker_id in range(concurrency)
+    ]
+
+    if mode == "process":
+        with multiprocessing.Pool(concurrency) as pool:
+            results = pool.starmap(_worker, jobs)
+    else:
+        results = [None] * concurrency
+
+        def target(i):
+            results[i] = _worker(*jobs[i])
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return _summarize([record for worker in results for record in worker], duration)
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse "op=weight,op=weight" into a dict"""
+    mix = {}
+    for part in spec.split(","):
+        op, weight = part.split("=")
+        mix[op.strip()] = int(weight)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite contention benchmark for database/db.py")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument(
+        "--configs", default="delete:full,wal:full,wal:normal",
+        help="comma-separated journal_mode:synchronous pairs"
+    )
+    parser.add_argument("--busy-timeout", type=float, default=5.0, help="sqlite busy timeout in seconds")
+    parser.add_argument("--mode", choices=["process", "thread"], default="process")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. verify_session=80,add_favorite=20")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    mix = parse_mix(args.mix)
+    results = []
+
+    print(f"mode={args.mode} duration={args.duration}s busy_timeout={args.busy_timeout}s mix={args.mix}")
+    print(f"{'config':<14}{'workers':>8}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'locked %':>10}{'errors':>8}")
+
+    for config in args.configs.split(","):
+        journal_mode, synchronous = config.split(":")
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = (str(Path(tmp) / "bench.db"), journal_mode, synchronous, args.busy_timeout)
+            _configure(*storage)
+            accounts = _setup(storage[0], args.users)
+
+            for concurrency in levels:
+                summary = run_level(storage, accounts, mix, concurrency, args.duration, args.mode, args.seed)
+                results.append({"config": config, "workers": concurrency, **summary})
+                print(
+                    f"{config:<14}{concurrency:>8}{summary['ops_per_sec']:>10}{summary['p50_ms']:>10}"
+                    f"{summary['p99_ms']:>10}{summary['locked_pct']:>10}{summary['errors']:>8}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
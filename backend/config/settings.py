@@ -15,17 +15,80 @@ class Settings:
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     
     # Server Settings
-    PORT: int = int(os.getenv("PORT", 5000))
+    PORT: int = int(os.getenv("PORT", 8000))
     HOST: str = os.getenv("HOST", "0.0.0.0")
+    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")  # "development" or "production"
+    WORKERS: int = int(os.getenv("WORKERS", os.cpu_count() or 1))
+    WARM_UP_CONNECTIONS: bool = os.getenv("WARM_UP_CONNECTIONS", "true").lower() == "true"
+    
+    # Database Settings (SQLite storage configuration)
+    DB_JOURNAL_MODE: str = os.getenv("DB_JOURNAL_MODE", "delete")  # "delete" (rollback journal) or "wal"
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "full")  # "full" or "normal"
+    DB_BUSY_TIMEOUT: float = float(os.getenv("DB_BUSY_TIMEOUT", 5.0))  # seconds to wait on a locked database
     
     # Google Maps Settings
     SEARCH_RADIUS: int = 5000  # 5km radius
+    SEARCH_MAX_QUERIES: int = int(os.getenv("SEARCH_MAX_QUERIES", 5))  # queries per multi-category search
+    # Defaults to SEARCH_MAX_QUERIES so a full multi-category search takes one upstream round
+    SEARCH_FANOUT_CONCURRENCY: int = int(os.getenv("SEARCH_FANOUT_CONCURRENCY", SEARCH_MAX_QUERIES))
+    
+    # Ranking Settings (weights are relative, they don't need to sum to 1)
+    RANK_DISTANCE_WEIGHT: float = float(os.getenv("RANK_DISTANCE_WEIGHT", 0.5))
+    RANK_RATING_WEIGHT: float = float(os.getenv("RANK_RATING_WEIGHT", 0.35))
+    RANK_POPULARITY_WEIGHT: float = float(os.getenv("RANK_POPULARITY_WEIGHT", 0.15))
+    RANK_DISTANCE_SCALE: float = float(os.getenv("RANK_DISTANCE_SCALE", 2000))  # meters at which closeness halves
+    
+    # Rate Limiting Settings (in-process, so limits apply per worker)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_PER_MINUTE", 30))  # searches per client
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", 10))
+    RATE_LIMIT_MAX_CLIENTS: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 10000))
+    SEARCH_MAX_IN_FLIGHT: int = int(os.getenv("SEARCH_MAX_IN_FLIGHT", 50))  # excess requests get 503
+    TRUST_PROXY_HEADERS: bool = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+    
+    # Profiling Settings (requests sending an allow-listed token in PROFILE_HEADER get profiled)
+    PROFILE_TOKENS: set = {t.strip() for t in os.getenv("PROFILE_TOKENS", "").split(",") if t.strip()}
+    PROFILE_HEADER: str = os.getenv("PROFILE_HEADER", "X-Profile-Token")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", str(backend_dir / "profiles"))
+    PROFILE_MAX_ARTIFACTS: int = int(os.getenv("PROFILE_MAX_ARTIFACTS", 100))
+    
+    # Place Cache Settings (shared on-disk cache, safe across worker processes)
+    PLACE_CACHE_PATH: str = os.getenv(
+        "PLACE_CACHE_PATH", str(backend_dir / "database" / "place_cache.db")
+    )
+    PLACE_CACHE_SEARCH_TTL: int = int(os.getenv("PLACE_CACHE_SEARCH_TTL", 6 * 60 * 60))  # 6 hours
+    PLACE_CACHE_DETAILS_TTL: int = int(os.getenv("PLACE_CACHE_DETAILS_TTL", 24 * 60 * 60))  # 24 hours
+    PLACE_CACHE_MAX_ENTRIES: int = int(os.getenv("PLACE_CACHE_MAX_ENTRIES", 20000))
+    PLACE_CACHE_BUSY_TIMEOUT: float = float(os.getenv("PLACE_CACHE_BUSY_TIMEOUT", 0.1))  # seconds
+    
+    # Prefetch Settings (background refresh of popular searches)
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_CALLS_PER_MINUTE: float = float(os.getenv("PREFETCH_CALLS_PER_MINUTE", 20))  # upstream call budget
+    PREFETCH_TOP_N: int = int(os.getenv("PREFETCH_TOP_N", 50))
+    PREFETCH_REFRESH_WINDOW: int = int(os.getenv("PREFETCH_REFRESH_WINDOW", 15 * 60))  # refresh 15 min before expiry
+    PREFETCH_INTERVAL: int = int(os.getenv("PREFETCH_INTERVAL", 30))
+    PREFETCH_HALF_LIFE: float = float(os.getenv("PREFETCH_HALF_LIFE", 2 * 60 * 60))  # 2 hours
+    
+    # Query Suggestion Settings
+    SUGGEST_CELL_DEGREES: float = float(os.getenv("SUGGEST_CELL_DEGREES", 0.1))  # ~11km cells
+    SUGGEST_MAX_PER_CELL: int = int(os.getenv("SUGGEST_MAX_PER_CELL", 500))
+    SUGGEST_MAX_CELLS: int = int(os.getenv("SUGGEST_MAX_CELLS", 2000))
+    SUGGEST_HALF_LIFE: float = float(os.getenv("SUGGEST_HALF_LIFE", 7 * 24 * 60 * 60))  # 1 week
+    SUGGEST_SNAPSHOT_PATH: str = os.getenv(
+        "SUGGEST_SNAPSHOT_PATH", str(backend_dir / "database" / "suggest_index.json")
+    )
+    SUGGEST_SNAPSHOT_INTERVAL: int = int(os.getenv("SUGGEST_SNAPSHOT_INTERVAL", 300))  # 5 minutes
     
     # API Endpoints
     GOOGLE_PLACES_TEXT_SEARCH: str = "https://maps.googleapis.com/maps/api/place/textsearch/json"
     GOOGLE_PLACE_DETAILS: str = "https://maps.googleapis.com/maps/api/place/details/json"
     GEMINI_API_URL: str = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
     
+    @property
+    def is_production(self) -> bool:
+        """Whether the server should run in production mode"""
+        return self.ENVIRONMENT.lower() == "production"
+    
     def validate(self) -> bool:
         """Validate that required settings are present"""
         if not self.GOOGLE_MAPS_API_KEY:
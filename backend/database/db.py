@@ -2,29 +2,42 @@ import sqlite3
 from pathlib import Path
 from typing import Optional
 import hashlib
+import json
 import secrets
+import zlib
+
+from config.settings import settings
+from services.geo import haversine_m, bounding_box
+from services.profiling import profiled
 
 # Database file path
 DB_PATH = Path(__file__).parent / "app.db"
 
+# Storage configuration (module-level so benchmarks can override it)
+JOURNAL_MODE = settings.DB_JOURNAL_MODE
+SYNCHRONOUS = settings.DB_SYNCHRONOUS
+BUSY_TIMEOUT = settings.DB_BUSY_TIMEOUT
+
 _db_initialized = False
 
 def get_db_connection():
     """Get a database connection"""
-    global _db_initialized
     if not _db_initialized:
         init_db()
-        _db_initialized = True
     DB_PATH.parent.mkdir(exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(DB_PATH), timeout=BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
     return conn
 
 def init_db():
     """Initialize the database with required tables"""
+    global _db_initialized
     DB_PATH.parent.mkdir(exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(DB_PATH), timeout=BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
+    # Journal mode is persistent, so it only needs setting here
+    conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
     cursor = conn.cursor()
     
     # Users table
@@ -38,21 +51,44 @@ def init_db():
         )
     """)
     
-    # Favorites table
+    # Places table: one shared, compactly encoded record per place
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS places (
+            place_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT,
+            rating REAL,
+            lat REAL,
+            lng REAL,
+            data BLOB,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Superseded by idx_favorites_user_location, which nearby queries can use
+    cursor.execute("DROP INDEX IF EXISTS idx_places_location")
+    
+    # Favorites table: thin join between users and places. The place's
+    # coordinates are copied in so a user's nearby favorites can be found
+    # from the (user_id, lat, lng) index without reading every favorite
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS favorites (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
             place_id TEXT NOT NULL,
-            place_name TEXT NOT NULL,
-            place_address TEXT,
-            place_rating REAL,
-            place_data TEXT,
+            lat REAL,
+            lng REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (place_id) REFERENCES places (place_id),
             UNIQUE(user_id, place_id)
         )
     """)
+    _migrate_favorites_to_places(cursor)
+    _migrate_favorite_locations(cursor)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_favorites_user_location
+        ON favorites (user_id, lat, lng)
+    """)
     
     # Sessions table for authentication
     cursor.execute("""
@@ -68,12 +104,123 @@ def init_db():
     
     conn.commit()
     conn.close()
+    _db_initialized = True
     print("Database initialized successfully")
 
+def _migrate_favorites_to_places(cursor):
+    """Move per-user place copies from old-style favorites rows into the places table"""
+    columns = {row['name'] for row in cursor.execute("PRAGMA table_info(favorites)")}
+    if 'place_data' not in columns:
+        return
+    
+    # Latest saved copy of each place wins
+    cursor.execute(
+        """SELECT place_id, place_name, place_address, place_rating, place_data 
+           FROM favorites ORDER BY created_at, id"""
+    )
+    places = {}
+    for row in cursor.fetchall():
+        try:
+            place_data = json.loads(row['place_data']) if row['place_data'] else {}
+        except ValueError:
+            place_data = {}
+        place_data.setdefault('place_id', row['place_id'])
+        place_data.setdefault('name', row['place_name'])
+        if row['place_address'] and 'formatted_address' not in place_data:
+            place_data['formatted_address'] = row['place_address']
+        if row['place_rating'] is not None:
+            place_data.setdefault('rating', row['place_rating'])
+        places[row['place_id']] = place_data
+    
+    for place_data in places.values():
+        _insert_place(cursor, place_data)
+    
+    cursor.execute("""
+        CREATE TABLE favorites_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            place_id TEXT NOT NULL,
+            lat REAL,
+            lng REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (place_id) REFERENCES places (place_id),
+            UNIQUE(user_id, place_id)
+        )
+    """)
+    cursor.execute(
+        """INSERT INTO favorites_new (id, user_id, place_id, lat, lng, created_at) 
+           SELECT f.id, f.user_id, f.place_id, p.lat, p.lng, f.created_at 
+           FROM favorites f LEFT JOIN places p ON p.place_id = f.place_id"""
+    )
+    cursor.execute("DROP TABLE favorites")
+    cursor.execute("ALTER TABLE favorites_new RENAME TO favorites")
+    print(f"Migrated favorites to {len(places)} shared places")
+
+def _migrate_favorite_locations(cursor):
+    """Add and backfill favorites.lat/lng on databases created without them"""
+    columns = {row['name'] for row in cursor.execute("PRAGMA table_info(favorites)")}
+    if 'lat' in columns:
+        return
+    cursor.execute("ALTER TABLE favorites ADD COLUMN lat REAL")
+    cursor.execute("ALTER TABLE favorites ADD COLUMN lng REAL")
+    cursor.execute("""
+        UPDATE favorites SET 
+            lat = (SELECT lat FROM places WHERE places.place_id = favorites.place_id), 
+            lng = (SELECT lng FROM places WHERE places.place_id = favorites.place_id)
+    """)
+    print(f"Backfilled locations for {cursor.rowcount} favorites")
+
+# Fields the search endpoint adds for one request; they don't belong in the shared record
+_PER_REQUEST_FIELDS = ('distance_m', 'matched_queries')
+
+def _encode_place(place_data: dict) -> bytes:
+    """Compact JSON, zlib-compressed, without per-request fields"""
+    place_data = {k: v for k, v in place_data.items() if k not in _PER_REQUEST_FIELDS}
+    return zlib.compress(json.dumps(place_data, separators=(',', ':')).encode())
+
+def _decode_place(data: Optional[bytes]) -> Optional[dict]:
+    """Inverse of _encode_place"""
+    if not data:
+        return None
+    return json.loads(zlib.decompress(data))
+
+def _insert_place(cursor, place_data: dict):
+    """
+    Create the shared record for a place if it doesn't exist yet
+
+    The first saved copy is kept; later saves come from clients and must not
+    overwrite what other users see. Only refresh_place() updates the record.
+    """
+    lat, lng = _place_location(place_data)
+    cursor.execute(
+        """INSERT INTO places (place_id, name, address, rating, lat, lng, data, updated_at) 
+           VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) 
+           ON CONFLICT(place_id) DO NOTHING""",
+        (
+            place_data.get('place_id'),
+            place_data.get('name'),
+            place_data.get('formatted_address', place_data.get('vicinity')),
+            place_data.get('rating'),
+            lat,
+            lng,
+            _encode_place(place_data)
+        )
+    )
+
+def _place_location(place_data: dict) -> tuple:
+    """Extract (lat, lng) from a place's geometry, or (None, None) if missing"""
+    location = (place_data.get('geometry') or {}).get('location') or {}
+    try:
+        return float(location['lat']), float(location['lng'])
+    except (KeyError, TypeError, ValueError):
+        return None, None
+
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
+@profiled("db")
 def create_user(username: str, email: str, password: str) -> Optional[int]:
     """Create a new user"""
     conn = get_db_connection()
@@ -93,6 +240,7 @@ def create_user(username: str, email: str, password: str) -> Optional[int]:
         conn.close()
         return None
 
+@profiled("db")
 def verify_user(username: str, password: str) -> Optional[dict]:
     """Verify user credentials"""
     conn = get_db_connection()
@@ -110,6 +258,7 @@ def verify_user(username: str, password: str) -> Optional[dict]:
         return dict(user)
     return None
 
+@profiled("db")
 def create_session(user_id: int) -> str:
     """Create a session token for a user"""
     conn = get_db_connection()
@@ -125,6 +274,7 @@ def create_session(user_id: int) -> str:
     
     return token
 
+@profiled("db")
 def verify_session(token: str) -> Optional[int]:
     """Verify a session token and return user_id"""
     conn = get_db_connection()
@@ -141,6 +291,7 @@ def verify_session(token: str) -> Optional[int]:
         return session['user_id']
     return None
 
+@profiled("db")
 def delete_session(token: str):
     """Delete a session (logout)"""
     conn = get_db_connection()
@@ -149,25 +300,23 @@ def delete_session(token: str):
     conn.commit()
     conn.close()
 
+# Columns returned for a favorite, in the shape the frontend expects
+_FAVORITE_COLUMNS = """f.id, f.place_id, p.name AS place_name, p.address AS place_address, 
+                  p.rating AS place_rating, p.data AS place_data, f.created_at"""
+
+@profiled("db")
 def add_favorite(user_id: int, place_data: dict) -> bool:
     """Add a place to user's favorites"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        import json
+        _insert_place(cursor, place_data)
+        # Location comes from the shared record so it matches the returned place_data
         cursor.execute(
-            """INSERT INTO favorites 
-               (user_id, place_id, place_name, place_address, place_rating, place_data) 
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (
-                user_id,
-                place_data.get('place_id'),
-                place_data.get('name'),
-                place_data.get('formatted_address', place_data.get('vicinity')),
-                place_data.get('rating'),
-                json.dumps(place_data)
-            )
+            """INSERT INTO favorites (user_id, place_id, lat, lng) 
+               SELECT ?, place_id, lat, lng FROM places WHERE place_id = ?""",
+            (user_id, place_data.get('place_id'))
         )
         conn.commit()
         conn.close()
@@ -176,6 +325,48 @@ def add_favorite(user_id: int, place_data: dict) -> bool:
         conn.close()
         return False
 
+@profiled("db")
+def refresh_place(place_data: dict, max_age: int) -> bool:
+    """
+    Update a saved place from Google Maps data
+
+    Only call this with data fetched by the server, never with a client
+    payload. Places nobody has saved, or refreshed within the last max_age
+    seconds, are left alone.
+
+    Returns:
+        True if the shared record was updated
+    """
+    lat, lng = _place_location(place_data)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """UPDATE places SET 
+               name = ?, address = ?, rating = ?, lat = ?, lng = ?, data = ?, 
+               updated_at = CURRENT_TIMESTAMP 
+           WHERE place_id = ? AND updated_at <= datetime('now', ?)""",
+        (
+            place_data.get('name'),
+            place_data.get('formatted_address', place_data.get('vicinity')),
+            place_data.get('rating'),
+            lat,
+            lng,
+            _encode_place(place_data),
+            place_data.get('place_id'),
+            f"-{int(max_age)} seconds"
+        )
+    )
+    refreshed = cursor.rowcount > 0
+    if refreshed:
+        cursor.execute(
+            "UPDATE favorites SET lat = ?, lng = ? WHERE place_id = ?",
+            (lat, lng, place_data.get('place_id'))
+        )
+    conn.commit()
+    conn.close()
+    return refreshed
+
+@profiled("db")
 def remove_favorite(user_id: int, place_id: str) -> bool:
     """Remove a place from user's favorites"""
     conn = get_db_connection()
@@ -185,30 +376,68 @@ def remove_favorite(user_id: int, place_id: str) -> bool:
         (user_id, place_id)
     )
     deleted = cursor.rowcount > 0
+    if deleted:
+        # Drop the shared record once nobody has it saved
+        cursor.execute(
+            """DELETE FROM places WHERE place_id = ? 
+               AND NOT EXISTS (SELECT 1 FROM favorites WHERE place_id = ?)""",
+            (place_id, place_id)
+        )
     conn.commit()
     conn.close()
     return deleted
 
+@profiled("db")
 def get_favorites(user_id: int) -> list:
     """Get all favorites for a user"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
-        """SELECT id, place_id, place_name, place_address, place_rating, place_data, created_at 
-           FROM favorites WHERE user_id = ? ORDER BY created_at DESC""",
+        f"""SELECT {_FAVORITE_COLUMNS} 
+           FROM favorites f JOIN places p ON p.place_id = f.place_id 
+           WHERE f.user_id = ? ORDER BY f.created_at DESC""",
         (user_id,)
     )
     favorites = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
-    # Parse JSON data
-    import json
     for fav in favorites:
-        if fav['place_data']:
-            fav['place_data'] = json.loads(fav['place_data'])
+        fav['place_data'] = _decode_place(fav['place_data'])
+    
+    return favorites
+
+@profiled("db")
+def get_favorites_nearby(user_id: int, lat: float, lng: float, radius_m: float) -> list:
+    """Get a user's favorites within radius_m meters of a point, nearest first"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_m)
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    # Bounding-box prefilter on the (user_id, lat, lng) index
+    cursor.execute(
+        f"""SELECT {_FAVORITE_COLUMNS}, f.lat, f.lng 
+           FROM favorites f JOIN places p ON p.place_id = f.place_id 
+           WHERE f.user_id = ? AND f.lat BETWEEN ? AND ? AND f.lng BETWEEN ? AND ?""",
+        (user_id, min_lat, max_lat, min_lng, max_lng)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    
+    # Exact distance check; only decode place data for rows inside the radius
+    favorites = []
+    for row in rows:
+        distance = haversine_m(lat, lng, row['lat'], row['lng'])
+        if distance <= radius_m:
+            fav = dict(row)
+            del fav['lat'], fav['lng']
+            fav['distance_m'] = round(distance, 1)
+            fav['place_data'] = _decode_place(fav['place_data'])
+            favorites.append(fav)
     
+    favorites.sort(key=lambda fav: fav['distance_m'])
     return favorites
 
+@profiled("db")
 def is_favorite(user_id: int, place_id: str) -> bool:
     """Check if a place is in user's favorites"""
     conn = get_db_connection()
@@ -221,5 +450,5 @@ def is_favorite(user_id: int, place_id: str) -> bool:
     conn.close()
     return result is not None
 
-# Database will be initialized when first accessed
-# init_db() is called by the first function that needs the database
+# Database is initialized by the app lifespan hook on startup; the first
+# function that needs the database calls init_db() if that hasn't happened
@@ -1,3 +1,10 @@
+import time
+
+# Measured from the first import so cold-start regressions show up
+_startup_began = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -9,18 +16,67 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from api.routes import search, health
+from api.routes import search, health, admin
 
 # Load environment variables from backend directory
 env_path = backend_dir / '.env'
 load_dotenv(dotenv_path=env_path)
 
+from config.settings import settings
+from database.db import init_db
+from services.http_client import warm_up, close_http_client
+from services.place_cache import place_cache
+from services.suggest_service import suggestion_index, run_maintenance
+from services.profiling import ProfilingMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize and warm up everything before the first request is served"""
+    app.state.ready = False
+    
+    init_db()
+    cache_stats = place_cache.stats()
+    print(f"✓ Place cache loaded ({cache_stats['live_entries']} live entries)")
+    suggestions = suggestion_index.load()
+    print(f"✓ Suggestion index loaded ({suggestions} queries)")
+    maintenance_task = asyncio.create_task(run_maintenance(suggestion_index))
+    
+    prefetch_task = None
+    if settings.PREFETCH_ENABLED:
+        prefetch_task = asyncio.create_task(search.prefetch_scheduler.run())
+    
+    if settings.WARM_UP_CONNECTIONS:
+        reached = await warm_up([
+            settings.GOOGLE_PLACES_TEXT_SEARCH,
+            settings.GEMINI_API_URL
+        ])
+        print(f"✓ Warmed up {reached} upstream connection(s)")
+    
+    app.state.startup_seconds = time.perf_counter() - _startup_began
+    app.state.ready = True
+    print(f"✓ Startup completed in {app.state.startup_seconds * 1000:.0f} ms")
+    
+    yield
+    
+    app.state.ready = False
+    maintenance_task.cancel()
+    if prefetch_task:
+        prefetch_task.cancel()
+    if suggestion_index.dirty:
+        try:
+            await asyncio.to_thread(suggestion_index.snapshot)
+        except Exception as e:
+            print(f"Suggestion index snapshot failed: {e}")
+    await close_http_client()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LocalMaps API",
     description="API for finding small businesses using Google Maps and Gemini AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.state.ready = False
 
 # Configure CORS
 app.add_middleware(
@@ -31,9 +87,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request profiling, only installed when profiling tokens are configured
+if settings.PROFILE_TOKENS:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(search.router, prefix="/api", tags=["search"])
 app.include_router(health.router, prefix="/api", tags=["health"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 # Try to include auth routes (optional if database isn't set up)
 try:
@@ -52,7 +113,10 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/api/health",
+            "ready": "/api/ready",
+            "limits": "/api/limits",
             "search": "/api/search",
+            "suggest": "/api/suggest",
             "place_details": "/api/place/{place_id}",
             "docs": "/docs",
             "redoc": "/redoc"
@@ -61,6 +125,16 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    print(f"Starting server on http://localhost:8000")
-    print(f"API Documentation available at http://localhost:8000/docs")
-    uvicorn.run("main:app", host="0.0.0.0", reload=True)
+    print(f"Starting server on http://localhost:{settings.PORT}")
+    print(f"API Documentation available at http://localhost:{settings.PORT}/docs")
+    if settings.is_production:
+        print(f"Production mode with {settings.WORKERS} worker(s)")
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=settings.WORKERS,
+            reload=False
+        )
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 class Location(BaseModel):
     """Location coordinates"""
@@ -8,8 +8,20 @@ class Location(BaseModel):
 
 class SearchRequest(BaseModel):
     """Request model for business search"""
-    query: str = Field(..., description="Search query (e.g., 'coffee shop')")
+    query: Optional[str] = Field(None, description="Search query (e.g., 'coffee shop')")
+    queries: Optional[List[str]] = Field(
+        None, description="Several queries searched together (e.g., ['bakery', 'florist'])"
+    )
     location: Location = Field(..., description="User's location")
+    sort: Literal["relevance", "distance", "rating", "score"] = Field(
+        "relevance", description="Result order; 'score' blends distance, rating and review count"
+    )
+    max_distance: Optional[float] = Field(None, gt=0, description="Maximum distance in meters")
+
+class SuggestResponse(BaseModel):
+    """Response model for query suggestions"""
+    success: bool
+    suggestions: List[str]
 
 class PlaceGeometry(BaseModel):
     """Place geometry information"""
@@ -50,6 +62,20 @@ class HealthResponse(BaseModel):
     google_maps_api_configured: bool
     gemini_api_configured: bool
 
+class ReadinessResponse(BaseModel):
+    """Readiness probe response"""
+    ready: bool
+    startup_ms: Optional[float] = None
+
+class RateLimitStatsResponse(BaseModel):
+    """Search admission counters"""
+    enabled: bool
+    admitted: int
+    rejected_rate_limited: int
+    rejected_overloaded: int
+    in_flight: int
+    tracked_clients: int
+
 # Auth schemas
 class RegisterRequest(BaseModel):
     """User registration request"""
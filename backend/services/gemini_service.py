@@ -1,4 +1,4 @@
-import httpx
+import hashlib
 import json
 from typing import List, Dict, Any
 import sys
@@ -8,6 +8,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.settings import settings
+from services.http_client import get_http_client
+from services.place_cache import place_cache
+from services.profiling import span
 
 class GeminiService:
     """Service for interacting with Google Gemini AI API"""
@@ -15,11 +18,21 @@ class GeminiService:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
         self.api_url = settings.GEMINI_API_URL
+        self.cache = place_cache
+    
+    @staticmethod
+    def filter_cache_key(places: List[Dict[str, Any]], search_query: str) -> str:
+        """Build the place cache key for a query and an ordered candidate list"""
+        query = " ".join(search_query.lower().split())
+        place_ids = [place.get("place_id") for place in places]
+        digest = hashlib.sha1(json.dumps([query, place_ids]).encode()).hexdigest()
+        return f"gemini:{digest}"
     
     async def filter_small_businesses(
         self, 
         places: List[Dict[str, Any]], 
-        search_query: str
+        search_query: str,
+        refresh: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Use Gemini AI to filter places and return only small businesses
@@ -27,6 +40,7 @@ class GeminiService:
         Args:
             places: List of places from Google Maps
             search_query: Original search query
+            refresh: Skip the cached classification and ask Gemini again
             
         Returns:
             Filtered list of small businesses
@@ -34,6 +48,12 @@ class GeminiService:
         if not places:
             return []
         
+        cache_key = self.filter_cache_key(places, search_query)
+        if not refresh:
+            cached_ids = self.cache.get(cache_key)
+            if cached_ids is not None:
+                return self._select(places, cached_ids)
+        
         try:
             # Prepare simplified place information for Gemini
             places_info = [
@@ -60,36 +80,40 @@ class GeminiService:
                 }]
             }
             
-            async with httpx.AsyncClient() as client:
+            client = get_http_client()
+            with span("gemini"):
                 response = await client.post(
                     f"{self.api_url}?key={self.api_key}",
                     json=payload,
                     timeout=30.0
                 )
-                response.raise_for_status()
-                data = response.json()
+            response.raise_for_status()
+            data = response.json()
             
             # Parse Gemini response
             gemini_text = data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "[]")
             
             # Extract the array of IDs
             small_business_ids = self._parse_gemini_response(gemini_text)
+            if small_business_ids:
+                self.cache.set(cache_key, small_business_ids, settings.PLACE_CACHE_SEARCH_TTL)
             
-            # Filter original places based on Gemini's selection
-            filtered_places = [
-                places[idx] 
-                for idx in small_business_ids 
-                if idx < len(places)
-            ]
-            
-            # Return filtered places or fallback to first 5
-            return filtered_places if filtered_places else places[:5]
+            return self._select(places, small_business_ids)
             
         except Exception as e:
             print(f"Gemini filtering error: {e}")
             # If filtering fails, return all places as fallback
             return places
     
+    def _select(self, places: List[Dict[str, Any]], ids: List[int]) -> List[Dict[str, Any]]:
+        """Pick the places Gemini selected, falling back to the first 5"""
+        filtered_places = [
+            places[idx] 
+            for idx in ids 
+            if idx < len(places)
+        ]
+        return filtered_places if filtered_places else places[:5]
+    
     def _create_filter_prompt(self, places_info: List[Dict], search_query: str) -> str:
         """Create the prompt for Gemini AI"""
         return f"""You are an expert at identifying small businesses vs chains/franchises.
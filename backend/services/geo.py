@@ -0,0 +1,45 @@
+import math
+from typing import Tuple
+
+EARTH_RADIUS_M = 6371008.8
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance between two points
+    
+    Args:
+        lat1, lng1: First point in degrees
+        lat2, lng2: Second point in degrees
+        
+    Returns:
+        Distance in meters
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    Lat/lng box that fully contains the circle of ``radius_m`` around a point
+    
+    Args:
+        lat, lng: Center in degrees
+        radius_m: Radius in meters
+        
+    Returns:
+        (min_lat, max_lat, min_lng, max_lng); the longitude range is widened
+        to the full globe near the poles or across the antimeridian
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    
+    cos_lat = math.cos(math.radians(lat))
+    if max_lat >= 90 or min_lat <= -90 or cos_lat < 1e-6:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    
+    dlng = math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat))
+    if lng - dlng < -180 or lng + dlng > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lng - dlng, lng + dlng
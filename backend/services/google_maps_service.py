@@ -1,4 +1,3 @@
-import httpx
 from typing import List, Dict, Any, Optional
 import sys
 from pathlib import Path
@@ -7,6 +6,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.settings import settings
+from services.http_client import get_http_client
+from services.place_cache import place_cache
+from services.profiling import span
 
 class GoogleMapsService:
     """Service for interacting with Google Maps API"""
@@ -14,8 +16,22 @@ class GoogleMapsService:
     def __init__(self):
         self.api_key = settings.GOOGLE_MAPS_API_KEY
         self.search_radius = settings.SEARCH_RADIUS
+        self.cache = place_cache
     
-    async def search_places(self, query: str, lat: float, lng: float) -> List[Dict[str, Any]]:
+    @staticmethod
+    def round_coordinates(lat: float, lng: float) -> tuple:
+        """Snap coordinates to ~100m so nearby searches share a cache entry"""
+        return round(lat, 3), round(lng, 3)
+    
+    def search_cache_key(self, query: str, lat: float, lng: float) -> str:
+        """Build the place cache key for a text search"""
+        lat, lng = self.round_coordinates(lat, lng)
+        query = " ".join(query.lower().split())
+        return f"search:{query}:{lat},{lng}:{self.search_radius}"
+    
+    async def search_places(
+        self, query: str, lat: float, lng: float, refresh: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Search for places using Google Maps Places API Text Search
         
@@ -23,10 +39,18 @@ class GoogleMapsService:
             query: Search query
             lat: Latitude
             lng: Longitude
+            refresh: Skip the cache and fetch from Google (the result is still cached)
             
         Returns:
             List of places
         """
+        cache_key = self.search_cache_key(query, lat, lng)
+        if not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        lat, lng = self.round_coordinates(lat, lng)
         url = settings.GOOGLE_PLACES_TEXT_SEARCH
         
         params = {
@@ -36,15 +60,18 @@ class GoogleMapsService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            client = get_http_client()
+            with span("maps"):
                 response = await client.get(url, params=params, timeout=30.0)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") not in ["OK", "ZERO_RESULTS"]:
-                    raise Exception(f"Google Maps API error: {data.get('status')}")
-                
-                return data.get("results", [])
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get("status") not in ["OK", "ZERO_RESULTS"]:
+                raise Exception(f"Google Maps API error: {data.get('status')}")
+            
+            results = data.get("results", [])
+            self.cache.set(cache_key, results, settings.PLACE_CACHE_SEARCH_TTL)
+            return results
         except Exception as e:
             print(f"Error searching places: {e}")
             raise
@@ -59,6 +86,11 @@ class GoogleMapsService:
         Returns:
             Place details
         """
+        cache_key = f"details:{place_id}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         url = settings.GOOGLE_PLACE_DETAILS
         
         params = {
@@ -67,10 +99,15 @@ class GoogleMapsService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            client = get_http_client()
+            with span("maps"):
                 response = await client.get(url, params=params, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get("status") == "OK":
+                self.cache.set(cache_key, data, settings.PLACE_CACHE_DETAILS_TTL)
+            return data
         except Exception as e:
             print(f"Error getting place details: {e}")
             raise
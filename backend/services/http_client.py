@@ -0,0 +1,42 @@
+import httpx
+from typing import Optional
+
+# Shared client so upstream calls reuse pooled keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide async HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _client
+
+async def warm_up(urls: list) -> int:
+    """
+    Open pooled connections to upstream hosts ahead of the first request
+
+    Args:
+        urls: URLs whose hosts should be connected to
+
+    Returns:
+        Number of hosts successfully reached
+    """
+    client = get_http_client()
+    reached = 0
+    for url in urls:
+        try:
+            await client.head(url, timeout=3.0)
+            reached += 1
+        except httpx.HTTPError as e:
+            print(f"Warm-up failed for {url}: {e}")
+    return reached
+
+async def close_http_client():
+    """Close the shared client (called on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
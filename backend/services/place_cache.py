@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from services.profiling import profiled
+
+class PlaceCache:
+    """
+    Persistent key/value cache for Google Maps and Gemini responses.
+
+    Backed by a SQLite file in WAL mode so entries survive restarts and are
+    shared by every uvicorn worker process. Each entry carries an expiry
+    timestamp; the table is kept under ``max_entries`` by dropping expired
+    rows first and then the rows closest to expiry.
+    """
+
+    # How many writes between eviction passes
+    EVICT_EVERY: int = 100
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = Path(path or settings.PLACE_CACHE_PATH)
+        self.max_entries = max_entries or settings.PLACE_CACHE_MAX_ENTRIES
+        self.busy_timeout = settings.PLACE_CACHE_BUSY_TIMEOUT
+        self._local = threading.local()
+        self._writes = 0
+        self._evicting = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening one if needed"""
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited through fork() must not be reused
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Short busy timeout: under contention a cache miss beats stalling the event loop
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS place_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_place_cache_expires ON place_cache (expires_at)"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @profiled("cache")
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The decoded value, or None if missing or expired
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM place_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Place cache read error: {e}")
+            return None
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Return the expiry timestamp of a live entry, or None if missing or expired"""
+        try:
+            row = self._connect().execute(
+                "SELECT expires_at FROM place_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Place cache read error: {e}")
+            return None
+        return row[0] if row else None
+
+    @profiled("cache")
+    def set(self, key: str, value: Any, ttl: int):
+        """
+        Store a value for ``ttl`` seconds
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Time to live in seconds
+        """
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO place_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), now, now + ttl)
+            )
+        except sqlite3.Error as e:
+            print(f"Place cache write error: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0 and not self._evicting:
+            # Eviction scans the table, so keep it off the request path
+            self._evicting = True
+            threading.Thread(target=self._evict_in_background, daemon=True).start()
+
+    def _evict_in_background(self):
+        try:
+            self.evict()
+        finally:
+            self._evicting = False
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        try:
+            self._connect().execute("DELETE FROM place_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Place cache delete error: {e}")
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then trim the table down to ``max_entries``
+
+        Returns:
+            Number of rows removed
+        """
+        try:
+            conn = self._connect()
+            removed = conn.execute(
+                "DELETE FROM place_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            count = conn.execute("SELECT COUNT(*) FROM place_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    """DELETE FROM place_cache WHERE key IN (
+                           SELECT key FROM place_cache ORDER BY expires_at LIMIT ?
+                       )""",
+                    (overflow,)
+                ).rowcount
+            return removed
+        except sqlite3.Error as e:
+            print(f"Place cache eviction error: {e}")
+            return 0
+
+    def stats(self) -> dict:
+        """Return entry counts for monitoring (zeros if the cache is unusable)"""
+        try:
+            conn = self._connect()
+            total = conn.execute("SELECT COUNT(*) FROM place_cache").fetchone()[0]
+            live = conn.execute(
+                "SELECT COUNT(*) FROM place_cache WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Place cache stats error: {e}")
+            total = live = 0
+        return {"entries": total, "live_entries": live, "max_entries": self.max_entries}
+
+place_cache = PlaceCache()
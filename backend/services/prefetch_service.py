@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from services.google_maps_service import GoogleMapsService
+from services.gemini_service import GeminiService
+
+# Upstream calls used by one refresh (Maps text search + Gemini filter)
+CALLS_PER_REFRESH = 2
+
+class PrefetchScheduler:
+    """
+    Keeps the most popular searches warm in the place cache.
+
+    ``record()`` is called for every interactive search and keeps a decayed
+    popularity score per (query, ~100m cell). A background loop periodically
+    re-runs the top entries whose cached results are about to expire. Refreshes
+    draw from a token bucket of ``calls_per_minute`` upstream calls, so the
+    prefetcher never spends more than that regardless of how much is due.
+    """
+    
+    def __init__(
+        self,
+        maps_service: GoogleMapsService,
+        gemini_service: GeminiService,
+        calls_per_minute: Optional[float] = None,
+        top_n: Optional[int] = None,
+        refresh_window: Optional[float] = None,
+        half_life: Optional[float] = None,
+        max_tracked: int = 2000
+    ):
+        self.maps_service = maps_service
+        self.gemini_service = gemini_service
+        if calls_per_minute is None:
+            # The cache is shared, so split the budget between worker processes
+            workers = settings.WORKERS if settings.is_production else 1
+            calls_per_minute = settings.PREFETCH_CALLS_PER_MINUTE / max(1, workers)
+        self.calls_per_minute = calls_per_minute
+        # The bucket must hold at least one refresh or none could ever run
+        self.bucket_capacity = max(calls_per_minute, CALLS_PER_REFRESH)
+        if calls_per_minute < CALLS_PER_REFRESH:
+            print(
+                f"Warning: prefetch budget of {calls_per_minute:.2f} calls/minute per worker "
+                f"allows less than one refresh per minute; raise PREFETCH_CALLS_PER_MINUTE"
+            )
+        self.top_n = top_n or settings.PREFETCH_TOP_N
+        self.refresh_window = refresh_window or settings.PREFETCH_REFRESH_WINDOW
+        self.half_life = half_life or settings.PREFETCH_HALF_LIFE
+        self.max_tracked = max_tracked
+        # (query, lat, lng) -> [score, last_updated]
+        self.popularity: Dict[Tuple[str, float, float], list] = {}
+        self.tokens = 0.0
+        self.refreshed = 0
+    
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+    
+    def record(self, query: str, lat: float, lng: float):
+        """Count one interactive search"""
+        query = " ".join(query.lower().split())
+        if not query:
+            return
+        lat, lng = self.maps_service.round_coordinates(lat, lng)
+        now = time.time()
+        
+        key = (query, lat, lng)
+        score, updated_at = self.popularity.get(key, (0.0, now))
+        self.popularity[key] = [self._decayed(score, updated_at, now) + 1.0, now]
+        
+        if len(self.popularity) > self.max_tracked:
+            excess = len(self.popularity) - int(self.max_tracked * 0.9)
+            for stale, _ in heapq.nsmallest(
+                excess,
+                self.popularity.items(),
+                key=lambda item: self._decayed(item[1][0], item[1][1], now)
+            ):
+                del self.popularity[stale]
+    
+    def hot_entries(self) -> List[Tuple[str, float, float]]:
+        """Most popular (query, lat, lng) entries, best first"""
+        now = time.time()
+        return heapq.nlargest(
+            self.top_n,
+            self.popularity,
+            key=lambda key: self._decayed(*self.popularity[key], now)
+        )
+    
+    def due_entries(self) -> List[Tuple[str, float, float]]:
+        """Hot entries whose cached search is missing or expires within the refresh window"""
+        deadline = time.time() + self.refresh_window
+        due = []
+        for query, lat, lng in self.hot_entries():
+            expires_at = self.maps_service.cache.expires_at(
+                self.maps_service.search_cache_key(query, lat, lng)
+            )
+            if expires_at is None or expires_at < deadline:
+                due.append((query, lat, lng))
+        return due
+    
+    async def refresh(self, query: str, lat: float, lng: float):
+        """Re-run a search upstream so both cache layers get fresh entries"""
+        places = await self.maps_service.search_places(query, lat, lng, refresh=True)
+        if places:
+            await self.gemini_service.filter_small_businesses(places, query, refresh=True)
+        self.refreshed += 1
+    
+    async def tick(self, elapsed: float):
+        """Top up the budget for ``elapsed`` seconds and refresh what it allows"""
+        self.tokens = min(
+            self.bucket_capacity,
+            self.tokens + self.calls_per_minute * elapsed / 60.0
+        )
+        for query, lat, lng in self.due_entries():
+            if self.tokens < CALLS_PER_REFRESH:
+                break
+            self.tokens -= CALLS_PER_REFRESH
+            try:
+                await self.refresh(query, lat, lng)
+            except Exception as e:
+                print(f"Prefetch of '{query}' at ({lat}, {lng}) failed: {e}")
+    
+    async def run(self, interval: Optional[float] = None):
+        """Background loop, started from the app lifespan"""
+        interval = interval or settings.PREFETCH_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.tick(interval)
+            except Exception as e:
+                print(f"Prefetch scheduler error: {e}")
@@ -0,0 +1,203 @@
+import cProfile
+import functools
+import io
+import json
+import pstats
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+# pyinstrument gives a real sampling profile that follows awaits; fall back to
+# cProfile when it isn't installed
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+class RequestProfile:
+    """Timeline of spans recorded for one profiled request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+
+    def elapsed_ms(self, since: Optional[float] = None) -> float:
+        return round((time.perf_counter() - (since or self.started)) * 1000, 2)
+
+# Set only while a profiled request is running; child tasks inherit it
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+class span:
+    """
+    Time a block of work (``with span("maps"): ...``) for the current profile.
+
+    When the request isn't being profiled this is a single ContextVar lookup.
+    """
+
+    __slots__ = ("name", "profile", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = _current_profile.get()
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.spans.append({
+                "name": self.name,
+                "start_ms": round((self.start - self.profile.started) * 1000, 2),
+                "duration_ms": self.profile.elapsed_ms(self.start)
+            })
+        return False
+
+def profiled(name: str) -> Callable:
+    """Decorator that wraps a synchronous function in ``span(name)``"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests carrying an allow-listed token.
+
+    Requests send the token in ``settings.PROFILE_HEADER``. Matching requests
+    get a sampling profile plus a span timeline, saved under
+    ``settings.PROFILE_DIR``. The artifact id comes back in the
+    ``X-Profile-Id`` response header. Other requests only pay for a header scan.
+
+    Paths under ``exclude_prefixes`` are never profiled; the admin endpoints
+    take the same token, and profiling them would crowd real artifacts out.
+    """
+
+    def __init__(
+        self,
+        app,
+        tokens: Optional[set] = None,
+        directory: Optional[Path] = None,
+        exclude_prefixes: tuple = ("/api/admin",)
+    ):
+        self.app = app
+        self.exclude_prefixes = exclude_prefixes
+        self.tokens = {t.encode() for t in (tokens or settings.PROFILE_TOKENS)}
+        self.header = settings.PROFILE_HEADER.lower().encode()
+        self.directory = Path(directory or settings.PROFILE_DIR)
+        self._sampling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == self.header:
+                if value in self.tokens:
+                    return await self._profile(scope, receive, send)
+                break
+        return await self.app(scope, receive, send)
+
+    def _start_sampler(self):
+        # Only one interpreter-level profiler can run at a time
+        if self._sampling:
+            return None
+        self._sampling = True
+        if Profiler is not None:
+            sampler = Profiler(async_mode="enabled")
+            sampler.start()
+        else:
+            # cProfile also sees other requests interleaved on the event loop
+            sampler = cProfile.Profile()
+            sampler.enable()
+        return sampler
+
+    def _stop_sampler(self, sampler) -> Optional[tuple]:
+        """Stop the sampler and return (file suffix, profiler scope, rendered profile)"""
+        if sampler is None:
+            return None
+        self._sampling = False
+        if Profiler is not None:
+            sampler.stop()
+            return "html", "request", sampler.output_html()
+        sampler.disable()
+        out = io.StringIO()
+        out.write(
+            "cProfile fallback (pyinstrument not installed): deterministic and "
+            "whole-process, so this includes every other request that ran on the "
+            "event loop meanwhile. Use the timeline for this request's breakdown.\n\n"
+        )
+        pstats.Stats(sampler, stream=out).sort_stats("cumulative").print_stats(60)
+        return "txt", "process", out.getvalue()
+
+    async def _profile(self, scope, receive, send):
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+        profile = RequestProfile()
+        status = {"code": None, "response_started_ms": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["response_started_ms"] = profile.elapsed_ms()
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        context_token = _current_profile.set(profile)
+        sampler = self._start_sampler()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            rendered = self._stop_sampler(sampler)
+            _current_profile.reset(context_token)
+            self._save(profile_id, scope, profile, status, rendered)
+
+    def _save(self, profile_id: str, scope, profile: RequestProfile, status: dict, rendered: Optional[tuple]):
+        total_ms = profile.elapsed_ms()
+        accounted_ms = sum(s["duration_ms"] for s in profile.spans)
+        artifact = {
+            "id": profile_id,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": status["code"],
+            "created_at": time.time(),
+            "total_ms": total_ms,
+            "response_started_ms": status["response_started_ms"],
+            # Routing, validation, serialization and anything without a span
+            # (concurrent spans can overlap, so this is a lower bound)
+            "unaccounted_ms": round(max(0.0, total_ms - accounted_ms), 2),
+            "timeline": profile.spans,
+            "profile_file": f"{profile_id}.{rendered[0]}" if rendered else None,
+            # "request" for a pyinstrument profile of this request only,
+            # "process" for the cProfile fallback, which covers everything
+            "profile_scope": rendered[1] if rendered else None
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if rendered:
+                (self.directory / artifact["profile_file"]).write_text(rendered[2])
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(artifact, indent=2))
+            prune_artifacts(self.directory)
+        except OSError as e:
+            print(f"Could not save profile {profile_id}: {e}")
+
+def prune_artifacts(directory: Path, keep: Optional[int] = None):
+    """Delete the oldest profiles beyond ``keep``"""
+    keep = keep or settings.PROFILE_MAX_ARTIFACTS
+    metas = sorted(directory.glob("*.json"), key=lambda p: p.name, reverse=True)
+    for meta in metas[keep:]:
+        for path in directory.glob(f"{meta.stem}.*"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,125 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from services.geo import EARTH_RADIUS_M
+
+class RankingService:
+    """Distance and rating based ranking of search candidates"""
+    
+    def __init__(self):
+        self.distance_weight = settings.RANK_DISTANCE_WEIGHT
+        self.rating_weight = settings.RANK_RATING_WEIGHT
+        self.popularity_weight = settings.RANK_POPULARITY_WEIGHT
+        self.distance_scale = settings.RANK_DISTANCE_SCALE
+    
+    @staticmethod
+    def _coordinates(places: List[Dict[str, Any]]) -> np.ndarray:
+        """Pull (lat, lng) out of each place, NaN where geometry is missing"""
+        coords = np.full((len(places), 2), np.nan)
+        for idx, place in enumerate(places):
+            location = (place.get("geometry") or {}).get("location") or {}
+            if location.get("lat") is not None and location.get("lng") is not None:
+                coords[idx] = (location["lat"], location["lng"])
+        return coords
+    
+    @staticmethod
+    def distances(coords: np.ndarray, lat: float, lng: float) -> np.ndarray:
+        """
+        Haversine distance from one point to every row of ``coords``
+        
+        Args:
+            coords: (n, 2) array of lat/lng in degrees
+            lat: Origin latitude
+            lng: Origin longitude
+            
+        Returns:
+            (n,) array of distances in meters (NaN where coords are NaN)
+        """
+        phi = np.radians(coords[:, 0])
+        dphi = phi - np.radians(lat)
+        dlmb = np.radians(coords[:, 1] - lng)
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi) * np.cos(np.radians(lat)) * np.sin(dlmb / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    
+    def scores(self, distances: np.ndarray, ratings: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Blend closeness, rating and review count into one score in [0, 1]
+        
+        Args:
+            distances: Distances in meters (NaN = unknown)
+            ratings: Ratings out of 5 (NaN = unrated)
+            counts: Number of user ratings
+            
+        Returns:
+            Score per place, higher is better
+        """
+        closeness = np.nan_to_num(1.0 / (1.0 + distances / self.distance_scale))
+        rating = np.nan_to_num(ratings / 5.0)
+        max_count = counts.max(initial=0.0)
+        popularity = np.log1p(counts) / np.log1p(max_count) if max_count > 0 else np.zeros_like(counts)
+        
+        total_weight = self.distance_weight + self.rating_weight + self.popularity_weight
+        return (
+            self.distance_weight * closeness
+            + self.rating_weight * rating
+            + self.popularity_weight * popularity
+        ) / total_weight
+    
+    def rank(
+        self,
+        places: List[Dict[str, Any]],
+        lat: float,
+        lng: float,
+        sort: str = "relevance",
+        max_distance: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Annotate places with ``distance_m``, then filter and order them
+        
+        Args:
+            places: Candidate places
+            lat: User latitude
+            lng: User longitude
+            sort: "relevance" (keep upstream order), "distance", "rating" or "score"
+            max_distance: Drop places farther than this many meters
+            
+        Returns:
+            New list of place dicts with ``distance_m`` set
+        """
+        if not places:
+            return []
+        
+        distances = self.distances(self._coordinates(places), lat, lng)
+        
+        keep = np.arange(len(places))
+        if max_distance is not None:
+            # NaN comparisons are False, so places without a location are dropped
+            keep = keep[distances <= max_distance]
+        
+        if sort != "relevance" and len(keep):
+            if sort == "distance":
+                order = np.argsort(np.nan_to_num(distances[keep], nan=np.inf), kind="stable")
+            else:
+                ratings = np.array([places[i].get("rating") or np.nan for i in keep], dtype=float)
+                if sort == "rating":
+                    key = np.nan_to_num(ratings, nan=-1.0)
+                else:
+                    counts = np.array([places[i].get("user_ratings_total") or 0 for i in keep], dtype=float)
+                    key = self.scores(distances[keep], ratings, counts)
+                order = np.argsort(-key, kind="stable")
+            keep = keep[order]
+        
+        ranked = []
+        for idx in keep.tolist():
+            distance = distances[idx]
+            ranked.append({
+                **places[idx],
+                "distance_m": None if np.isnan(distance) else round(float(distance), 1)
+            })
+        return ranked
@@ -0,0 +1,189 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets.
+
+    Each client may burst up to ``burst`` requests and then gets ``rate``
+    requests per second. Only the ``max_clients`` most recently seen clients
+    are tracked, so memory stays bounded under IP-spraying bots.
+    """
+    
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # client key -> (tokens, last_refill)
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+    
+    def try_acquire(self, key: str) -> Tuple[bool, float]:
+        """
+        Take one token for ``key``
+        
+        Returns:
+            (allowed, seconds until a token is available)
+        """
+        now = time.monotonic()
+        tokens, last = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self.buckets[key] = (tokens, now)
+        
+        while len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        
+        return allowed, 0.0 if allowed else (1.0 - tokens) / self.rate
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests; callers are rejected instead of queued"""
+    
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+    
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+        return True
+    
+    def release(self):
+        self.in_flight = max(0, self.in_flight - 1)
+
+class AdmissionController:
+    """Per-client rate limiting plus global load shedding, with rejection counters"""
+    
+    def __init__(self):
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.rate_limiter = TokenBucketLimiter(
+            rate=settings.RATE_LIMIT_PER_MINUTE / 60.0,
+            burst=settings.RATE_LIMIT_BURST,
+            max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+        )
+        self.concurrency_limiter = ConcurrencyLimiter(settings.SEARCH_MAX_IN_FLIGHT)
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_overloaded = 0
+    
+    def enter(self) -> Optional[Tuple[int, int]]:
+        """
+        Take an in-flight slot, shedding the request if the server is saturated
+
+        Call this before identifying the caller, so shed requests cost nothing
+        and don't spend the client's rate limit budget.
+        
+        Returns:
+            None if a slot was taken (call ``release()`` when done), otherwise
+            (503, retry_after_seconds)
+        """
+        if not self.enabled:
+            return None
+        
+        if not self.concurrency_limiter.try_acquire():
+            self.rejected_overloaded += 1
+            return 503, 1
+        return None
+    
+    def charge(self, client_key: str) -> Optional[Tuple[int, int]]:
+        """
+        Spend one token for a caller that already holds a slot from ``enter()``
+        
+        Args:
+            client_key: Identifies the caller (see ``client_key()``)
+            
+        Returns:
+            None if admitted, otherwise (429, retry_after_seconds); the slot
+            is released on rejection
+        """
+        if not self.enabled:
+            return None
+        
+        allowed, wait = self.rate_limiter.try_acquire(client_key)
+        if not allowed:
+            self.concurrency_limiter.release()
+            self.rejected_rate_limited += 1
+            return 429, max(1, math.ceil(wait))
+        
+        self.admitted += 1
+        return None
+    
+    def release(self):
+        if self.enabled:
+            self.concurrency_limiter.release()
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "admitted": self.admitted,
+            "rejected_rate_limited": self.rejected_rate_limited,
+            "rejected_overloaded": self.rejected_overloaded,
+            "in_flight": self.concurrency_limiter.in_flight,
+            "tracked_clients": len(self.rate_limiter.buckets)
+        }
+
+class SessionCache:
+    """
+    Short-lived LRU of session token -> user id (None for invalid tokens).
+
+    Lets rate limiting identify signed-in callers without a database lookup
+    per request. Invalid tokens are cached too, so a burst of junk tokens
+    costs at most one lookup per token per ``ttl``.
+    """
+    
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # token -> (user_id, expires_at)
+        self.entries: "OrderedDict[str, Tuple[Optional[int], float]]" = OrderedDict()
+    
+    def get(self, token: str) -> Tuple[bool, Optional[int]]:
+        """
+        Returns:
+            (found, user_id)
+        """
+        entry = self.entries.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            return False, None
+        self.entries.move_to_end(token)
+        return True, entry[0]
+    
+    def put(self, token: str, user_id: Optional[int]):
+        self.entries.pop(token, None)
+        self.entries[token] = (user_id, time.monotonic() + self.ttl)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+def client_key(user_id: Optional[int], client_host: Optional[str], forwarded_for: Optional[str]) -> str:
+    """
+    Pick the identity a request is rate limited by
+
+    Args:
+        user_id: The user behind a verified session token, if any
+        client_host: Peer address of the connection
+        forwarded_for: X-Forwarded-For header (only used if TRUST_PROXY_HEADERS)
+
+    Returns:
+        "user:<id>" for signed-in users, otherwise "ip:<address>". Unverified
+        tokens fall back to the IP, so rotating fake tokens gets no fresh buckets.
+    """
+    if user_id is not None:
+        return f"user:{user_id}"
+    if settings.TRUST_PROXY_HEADERS and forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f"ip:{client_host or 'unknown'}"
+
+search_admission = AdmissionController()
+session_cache = SessionCache()
@@ -0,0 +1,306 @@
+import asyncio
+import bisect
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+# Cell holding suggestions from every location
+GLOBAL_CELL = "*"
+
+def normalize_query(query: str) -> str:
+    """Lowercase a query and collapse its whitespace"""
+    return " ".join(query.lower().split())[:100]
+
+class _Cell:
+    """Prefix index for one geo cell: a sorted list of queries plus their scores"""
+
+    __slots__ = ("queries", "stats")
+
+    def __init__(self):
+        self.queries: List[str] = []
+        # query -> [score, last_updated]
+        self.stats: Dict[str, list] = {}
+
+    def add(self, query: str, score: float, updated_at: float):
+        if query not in self.stats:
+            bisect.insort(self.queries, query)
+        self.stats[query] = [score, updated_at]
+
+    def remove(self, query: str):
+        del self.stats[query]
+        idx = bisect.bisect_left(self.queries, query)
+        del self.queries[idx]
+
+    def prefix_range(self, prefix: str) -> List[str]:
+        """Return all queries starting with ``prefix``"""
+        lo = bisect.bisect_left(self.queries, prefix)
+        hi = bisect.bisect_left(self.queries, prefix + "\uffff")
+        return self.queries[lo:hi]
+
+class SuggestionIndex:
+    """
+    In-memory autocomplete index of past search queries.
+
+    Queries are bucketed into coarse lat/lng cells (plus one global cell) and
+    scored by how often they were searched, with scores halving every
+    ``half_life`` seconds so recent searches rank higher. Decay is applied
+    lazily on read and by ``maintain()``, which also prunes faded entries.
+    Memory is bounded by ``max_per_cell`` queries per cell and ``max_cells``
+    cells (least recently updated cells are dropped first).
+
+    Each worker process keeps its own index and snapshots it to its own file;
+    ``load()`` merges every worker's file. ``maintain()`` and ``snapshot()``
+    are meant to run in a thread, so all access goes through ``self.lock``,
+    which they hold for one cell at a time.
+    """
+
+    def __init__(
+        self,
+        cell_degrees: Optional[float] = None,
+        max_per_cell: Optional[int] = None,
+        max_cells: Optional[int] = None,
+        half_life: Optional[float] = None
+    ):
+        self.cell_degrees = cell_degrees or settings.SUGGEST_CELL_DEGREES
+        self.max_per_cell = max_per_cell or settings.SUGGEST_MAX_PER_CELL
+        self.max_cells = max_cells or settings.SUGGEST_MAX_CELLS
+        self.half_life = half_life or settings.SUGGEST_HALF_LIFE
+        self.cells: "OrderedDict[str, _Cell]" = OrderedDict()
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def cell_key(self, lat: float, lng: float) -> str:
+        """Map coordinates to their grid cell"""
+        size = self.cell_degrees
+        return f"{math.floor(lat / size)}:{math.floor(lng / size)}"
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, query: str, lat: float, lng: float, now: Optional[float] = None):
+        """
+        Count one search for ``query`` at a location
+
+        Args:
+            query: Raw search query
+            lat: Latitude of the search
+            lng: Longitude of the search
+            now: Timestamp override (defaults to current time)
+        """
+        query = normalize_query(query)
+        if not query:
+            return
+        now = now or time.time()
+
+        with self.lock:
+            for key in (self.cell_key(lat, lng), GLOBAL_CELL):
+                cell = self.cells.get(key)
+                if cell is None:
+                    cell = self.cells[key] = _Cell()
+                self.cells.move_to_end(key)
+
+                score, updated_at = cell.stats.get(query, (0.0, now))
+                cell.add(query, self._decayed(score, updated_at, now) + 1.0, now)
+                if len(cell.stats) > self.max_per_cell:
+                    self._trim(cell, now)
+
+            self._drop_oldest_cells()
+            self.dirty = True
+
+    def _drop_oldest_cells(self):
+        """Drop least recently updated cells beyond ``max_cells``"""
+        while len(self.cells) > self.max_cells:
+            oldest = next(iter(self.cells))
+            if oldest == GLOBAL_CELL:
+                self.cells.move_to_end(GLOBAL_CELL)
+                continue
+            del self.cells[oldest]
+
+    def _trim(self, cell: _Cell, now: float):
+        """Drop the lowest scoring queries until the cell is at 90% capacity"""
+        target = int(self.max_per_cell * 0.9)
+        excess = len(cell.stats) - target
+        if excess <= 0:
+            return
+        weakest = heapq.nsmallest(
+            excess,
+            cell.stats.items(),
+            key=lambda item: self._decayed(item[1][0], item[1][1], now)
+        )
+        for query, _ in weakest:
+            cell.remove(query)
+
+    def suggest(
+        self,
+        prefix: str,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        limit: int = 5
+    ) -> List[str]:
+        """
+        Get the top queries starting with ``prefix``
+
+        Args:
+            prefix: What the user has typed so far
+            lat: Latitude of the user (optional)
+            lng: Longitude of the user (optional)
+            limit: Maximum number of suggestions
+
+        Returns:
+            Queries ordered by decayed score, local cell first, then global
+        """
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return []
+        now = time.time()
+
+        keys = [GLOBAL_CELL]
+        if lat is not None and lng is not None:
+            keys.insert(0, self.cell_key(lat, lng))
+
+        suggestions: List[str] = []
+        with self.lock:
+            for key in keys:
+                cell = self.cells.get(key)
+                if cell is None:
+                    continue
+                ranked = heapq.nlargest(
+                    limit,
+                    cell.prefix_range(prefix),
+                    key=lambda q: self._decayed(*cell.stats[q], now)
+                )
+                for query in ranked:
+                    if query not in suggestions:
+                        suggestions.append(query)
+                if len(suggestions) >= limit:
+                    break
+        return suggestions[:limit]
+
+    def maintain(self, min_score: float = 0.05):
+        """Apply decay to every entry and prune those that have faded out"""
+        now = time.time()
+        with self.lock:
+            keys = list(self.cells)
+        for key in keys:
+            with self.lock:
+                cell = self.cells.get(key)
+                if cell is None:
+                    continue
+                for query, (score, updated_at) in list(cell.stats.items()):
+                    decayed = self._decayed(score, updated_at, now)
+                    if decayed < min_score:
+                        cell.remove(query)
+                    else:
+                        cell.stats[query] = [decayed, now]
+                if not cell.stats and key != GLOBAL_CELL:
+                    del self.cells[key]
+                self.dirty = True
+
+    def _worker_path(self, path: Path) -> Path:
+        """This process's snapshot file, e.g. suggest_index.1234.json"""
+        return path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+
+    def snapshot(self, path: Optional[str] = None):
+        """
+        Write this worker's index to disk atomically
+
+        Also removes other workers' files that haven't been updated for a few
+        snapshot intervals; their workers are gone and the data was merged
+        into the current workers when they loaded.
+        """
+        path = Path(path or settings.SUGGEST_SNAPSHOT_PATH)
+        data = {}
+        with self.lock:
+            keys = list(self.cells)
+            self.dirty = False
+        for key in keys:
+            with self.lock:
+                cell = self.cells.get(key)
+                if cell is not None:
+                    # Entries are replaced, never mutated, so a shallow copy is enough
+                    data[key] = dict(cell.stats)
+
+        worker_path = self._worker_path(path)
+        tmp_path = worker_path.with_name(f"{worker_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, worker_path)
+
+        stale_before = time.time() - 3 * settings.SUGGEST_SNAPSHOT_INTERVAL
+        for other in path.parent.glob(f"{path.stem}*{path.suffix}"):
+            if other == worker_path:
+                continue
+            try:
+                if other.stat().st_mtime < stale_before:
+                    other.unlink()
+            except OSError:
+                # Another worker sweeping at the same time may have removed it
+                pass
+
+    def load(self, path: Optional[str] = None) -> int:
+        """
+        Merge the snapshots written by every worker
+
+        Each worker sees a share of the traffic, so a query's score is
+        taken as its highest score across files rather than the sum; that
+        keeps the ranking without multiplying scores on every restart.
+
+        Returns:
+            Number of queries loaded
+        """
+        path = Path(path or settings.SUGGEST_SNAPSHOT_PATH)
+        now = time.time()
+        merged: Dict[str, Dict[str, list]] = {}
+        for snapshot_path in sorted(path.parent.glob(f"{path.stem}*{path.suffix}")):
+            try:
+                with open(snapshot_path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not load suggestion snapshot {snapshot_path.name}: {e}")
+                continue
+            for key, stats in data.items():
+                cell_stats = merged.setdefault(key, {})
+                for query, (score, updated_at) in stats.items():
+                    decayed = self._decayed(score, updated_at, now)
+                    if query not in cell_stats or decayed > cell_stats[query][0]:
+                        cell_stats[query] = [decayed, now]
+
+        loaded = 0
+        with self.lock:
+            self.cells.clear()
+            for key, stats in merged.items():
+                cell = self.cells[key] = _Cell()
+                cell.stats = stats
+                cell.queries = sorted(stats)
+                if len(stats) > self.max_per_cell:
+                    self._trim(cell, now)
+                loaded += len(cell.stats)
+            self._drop_oldest_cells()
+            self.dirty = False
+        return loaded
+
+async def run_maintenance(index: SuggestionIndex, interval: Optional[float] = None):
+    """Periodically decay the index and snapshot it to disk"""
+    interval = interval or settings.SUGGEST_SNAPSHOT_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # Both walk the whole index, so keep them off the event loop
+            await asyncio.to_thread(index.maintain)
+            await asyncio.to_thread(index.snapshot)
+        except Exception as e:
+            print(f"Suggestion index maintenance error: {e}")
+
+suggestion_index = SuggestionIndex()